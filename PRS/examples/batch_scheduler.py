@@ -1,4 +1,5 @@
 import random
+import sys
 from prs import PRS
 
 def main():
@@ -7,15 +8,17 @@ def main():
 
     # Generate tasks (batch jobs)
     jobs = [f"Job-{i}" for i in range(1, 13)]
+    log = []
     for job in jobs:
         prio = random.randint(1, 3)
         stack.push(job, prio)
-        print(f"📥 Scheduled {job} (priority {prio})")
+        log.append(f"📥 Scheduled {job} (priority {prio})")
 
-    print("\n=== Processing jobs ===")
+    log.append("\n=== Processing jobs ===")
     while not stack.is_empty():
         job = stack.pop()
-        print(f"⚡ Running {job}")
+        log.append(f"⚡ Running {job}")
+    sys.stdout.write("\n".join(log) + "\n")
 
     print("\n✅ All jobs processed.")
 
@@ -1,4 +1,5 @@
 import random
+import sys
 from prs import PRS
 
 def main():
@@ -7,15 +8,17 @@ def main():
 
     # Simulate frame updates with priorities
     frames = [f"Frame-{i}" for i in range(1, 16)]
+    log = []
     for frame in frames:
         prio = random.choice([1, 2, 3])
         stack.push(frame, prio)
-        print(f"🎮 Queued {frame} (priority {prio})")
+        log.append(f"🎮 Queued {frame} (priority {prio})")
 
-    print("\n=== Rendering Frames ===")
+    log.append("\n=== Rendering Frames ===")
     while not stack.is_empty():
         frame = stack.pop()
-        print(f"🖼️ Rendered {frame}")
+        log.append(f"🖼️ Rendered {frame}")
+    sys.stdout.write("\n".join(log) + "\n")
 
     print("\n✅ All frames rendered.")
 
@@ -6,7 +6,7 @@ Features:
 - Generate a large synthetic workload (>1000 jobs by default).
 - Optionally let the user add custom jobs interactively before the run.
 - Run three schedulers over the same final job list:
-    * PRS (rows, your structure)
+    * PRS (rows, your structure), also timed via the bulk_drain_indices kernel
     * Global Priority Queue (heapq)
     * Plain Stack (LIFO)
 - Compute metrics and print comparison results.
@@ -20,12 +20,12 @@ Interactive usage:
 """
 from __future__ import annotations
 import argparse
-import random
 import time
 import heapq
-import statistics
 from typing import List, Dict, Tuple
 
+import numpy as np
+
 # Import your PRS library; ensure you're running from repo root so `prs` package is importable.
 from prs import PRS
 
@@ -33,102 +33,123 @@ from prs import PRS
 # Job generation
 # ----------------------------
 def generate_jobs(num_jobs: int, priority_levels: int,
-                  batch_min: int = 1, batch_max: int = 12, seed: int | None = None) -> List[Dict]:
+                  batch_min: int = 1, batch_max: int = 12, seed: int | None = None) -> Dict:
     """
-    Create a list of job dicts with fields: id, priority, arrival_idx.
-    Jobs are generated in batches to create row-like grouping behavior.
+    Create a columnar job table: {"ids": [...], "priorities": ndarray, "arrival_idx": ndarray}.
+    Job i is row i of every column, so schedulers carry plain integer indices.
+    Jobs are generated in batches to create row-like grouping behavior, with all
+    random draws done as whole NumPy arrays.
     """
-    if seed is not None:
-        random.seed(seed)
-
-    jobs: List[Dict] = []
-    jid = 0
-    while jid < num_jobs:
-        batch_size = random.randint(batch_min, batch_max)
-        batch_bias = random.random()
-        for _ in range(batch_size):
-            if jid >= num_jobs:
-                break
-            # create varied priority distributions using bias
-            if batch_bias < 0.15:
-                pr = random.choices(range(1, priority_levels+1), weights=[40,25,15,12,8][:priority_levels])[0]
-            elif batch_bias < 0.5:
-                pr = random.choices(range(1, priority_levels+1), weights=[10,25,30,20,15][:priority_levels])[0]
-            else:
-                pr = random.randint(1, priority_levels)
-            jobs.append({"id": f"job-{jid+1}", "priority": pr, "arrival_idx": jid})
-            jid += 1
-    return jobs
+    rng = np.random.default_rng(seed)
+
+    # Batches: draw enough sizes to cover num_jobs (each batch holds at least one job),
+    # then label every job with the batch it falls in.
+    sizes = rng.integers(max(batch_min, 1), batch_max + 1, size=num_jobs)
+    batch_of_job = np.repeat(np.arange(num_jobs), sizes)[:num_jobs]
+    num_batches = int(batch_of_job[-1]) + 1 if num_jobs else 0
+    job_bias = rng.random(size=num_batches)[batch_of_job]
+
+    # create varied priority distributions using bias, one vectorized draw per regime
+    w_high = np.array([40, 25, 15, 12, 8][:priority_levels], dtype=float)
+    w_mid = np.array([10, 25, 30, 20, 15][:priority_levels], dtype=float)
+    high = job_bias < 0.15
+    mid = (job_bias >= 0.15) & (job_bias < 0.5)
+    uniform = job_bias >= 0.5
+    priorities = np.empty(num_jobs, dtype=np.int64)
+    priorities[high] = rng.choice(len(w_high), p=w_high / w_high.sum(), size=int(high.sum())) + 1
+    priorities[mid] = rng.choice(len(w_mid), p=w_mid / w_mid.sum(), size=int(mid.sum())) + 1
+    priorities[uniform] = rng.integers(1, priority_levels + 1, size=int(uniform.sum()))
+    return {
+        "ids": [f"job-{i+1}" for i in range(num_jobs)],
+        "priorities": priorities,
+        "arrival_idx": np.arange(num_jobs),
+    }
 
 # ----------------------------
 # Scheduler implementations
 # ----------------------------
-def run_global_priority_queue(jobs: List[Dict]) -> Tuple[List[Dict], float]:
+# Each scheduler takes the job table and returns the completion order as a list of
+# job indices (rows of the table), plus the elapsed time of the scheduling itself.
+def run_global_priority_queue(jobs: Dict) -> Tuple[List[int], float]:
+    priorities = jobs["priorities"].tolist()
     start = time.perf_counter()
-    heap: List[Tuple[int, int, Dict]] = []
-    for job in jobs:
-        heapq.heappush(heap, (job["priority"], job["arrival_idx"], job))
-    out: List[Dict] = []
+    # Heap entries are single ints packing (priority, arrival index) as
+    # priority << 32 | idx, so comparisons are plain int compares, not tuple ones.
+    # All jobs are known up front, so build the heap in O(N) with one heapify call.
+    heap: List[int] = [(pr << 32) | idx for idx, pr in enumerate(priorities)]
+    heapq.heapify(heap)
+    out: List[int] = []
     while heap:
-        _, _, j = heapq.heappop(heap)
-        out.append(j)
+        out.append(heapq.heappop(heap) & 0xFFFFFFFF)
     elapsed = time.perf_counter() - start
     return out, elapsed
 
-def run_stack(jobs: List[Dict]) -> Tuple[List[Dict], float]:
+def run_stack(jobs: Dict) -> Tuple[List[int], float]:
+    num_jobs = len(jobs["ids"])
     start = time.perf_counter()
     st = []
-    for job in jobs:
-        st.append(job)
+    for idx in range(num_jobs):
+        st.append(idx)
     out = []
     while st:
         out.append(st.pop())
     elapsed = time.perf_counter() - start
     return out, elapsed
 
-def run_prs(jobs: List[Dict], k: int, n: int, m: int | None = None) -> Tuple[List[Dict], float]:
+def run_prs(jobs: Dict, k: int, n: int, m: int | None = None) -> Tuple[List[int], float]:
+    priorities = jobs["priorities"].tolist()
     start = time.perf_counter()
     prs = PRS(k=k, n=n, m=m)
-    for job in jobs:
-        prs.push(job, job["priority"])
-    out: List[Dict] = []
+    prs.extend(range(len(priorities)), priorities)
+    out: List[int] = []
     while not prs.is_empty():
         out.append(prs.pop())
     elapsed = time.perf_counter() - start
     return out, elapsed
 
+def run_prs_bulk(jobs: Dict, k: int, n: int, m: int | None = None) -> Tuple[List[int], float]:
+    # Same completion order as run_prs, computed by the numeric kernel behind
+    # PRS.bulk_drain_indices (Numba-compiled when installed). One tiny warm-up call
+    # keeps any JIT compilation out of the timing.
+    prs = PRS(k=k, n=n, m=m)
+    prs.bulk_drain_indices(jobs["priorities"][:1])
+    start = time.perf_counter()
+    out = prs.bulk_drain_indices(jobs["priorities"])
+    elapsed = time.perf_counter() - start
+    return out.tolist(), elapsed
+
 # ----------------------------
 # Metrics
 # ----------------------------
-def compute_metrics(jobs: List[Dict], completion_order: List[Dict]) -> Dict:
-    N = len(jobs)
-    arrival_map = {job["id"]: job["arrival_idx"] for job in jobs}
-    completion_pos = {job["id"]: idx for idx, job in enumerate(completion_order)}
-    # positions in original arrival order
-    positions = [completion_pos[j["id"]] for j in jobs]
-    avg_pos = statistics.mean(positions)
+def compute_metrics(jobs: Dict, completion_order: List[int]) -> Dict:
+    priorities = jobs["priorities"]
+    N = len(priorities)
+    order = np.asarray(completion_order, dtype=np.intp)
+    # positions in original arrival order: positions[job] = completion slot of job
+    positions = np.empty(N, dtype=np.int64)
+    positions[order] = np.arange(N)
+    avg_pos = float(positions.mean())
     norm_avg = avg_pos / N
     # per-priority stats
-    by_pr = {}
-    for j in jobs:
-        p = j["priority"]
-        by_pr.setdefault(p, []).append(completion_pos[j["id"]])
-    pr_stats = {p: {"count": len(lst), "mean_pos": statistics.mean(lst)} for p, lst in by_pr.items()}
+    levels, ranks = np.unique(priorities, return_inverse=True)
+    counts = np.bincount(ranks, minlength=len(levels))
+    pos_sums = np.bincount(ranks, weights=positions, minlength=len(levels))
+    pr_stats = {int(p): {"count": int(c), "mean_pos": float(t / c)}
+                for p, c, t in zip(levels, counts, pos_sums)}
 
     # inversions: count pairs (i before j) in completion where priority[i] > priority[j]
-    # We'll use O(N^2) approach — acceptable for ~1500 jobs; reduce if you scale >20k.
-    inversions = 0
-    id_to_priority = {j["id"]: j["priority"] for j in jobs}
-    N = len(completion_order)
-    for i in range(N):
-        pri_i = id_to_priority[completion_order[i]["id"]]
-        for j in range(i+1, N):
-            pri_j = id_to_priority[completion_order[j]["id"]]
-            if pri_i > pri_j:  # lower priority finished earlier than higher priority => inversion
-                inversions += 1
+    # There are only a few distinct priorities, so for every completion slot we count
+    # the already-completed jobs of each level (prefix sums over a one-hot table) and
+    # add up the lower-priority ones: O(N * levels) with no Python inner loop.
+    completion_ranks = ranks[order]
+    onehot = np.zeros((N, len(levels)), dtype=np.int64)
+    onehot[np.arange(N), completion_ranks] = 1
+    seen_before = np.cumsum(onehot, axis=0) - onehot
+    lower_priority = np.arange(len(levels)) > completion_ranks[:, None]  # lower priority finished earlier => inversion
+    inversions = int(seen_before[lower_priority].sum())
 
     return {
-        "N": len(jobs),
+        "N": N,
         "avg_completion_pos": avg_pos,
         "normalized_avg_pos": norm_avg,
         "per_priority": pr_stats,
@@ -150,10 +171,11 @@ def pretty_print_metrics(name: str, metrics: Dict, elapsed: float):
 # ----------------------------
 # Interactive pre-run (optional)
 # ----------------------------
-def prompt_user_jobs() -> List[Dict]:
+def prompt_user_jobs() -> List[Tuple[str, int]]:
+    """Return custom jobs as (id, priority) tuples; arrival order is their list position."""
     print("Enter custom jobs one per line in the format: <name> <priority>")
     print("Priority must be integer (1 = highest). Press Enter on an empty line to finish.")
-    user_jobs = []
+    user_jobs: List[Tuple[str, int]] = []
     idx = 0
     while True:
         try:
@@ -172,7 +194,7 @@ def prompt_user_jobs() -> List[Dict]:
         except ValueError:
             print("  priority must be integer")
             continue
-        user_jobs.append({"id": f"user-{idx+1}-{name.replace(' ','_')}", "priority": pr, "arrival_idx": None})
+        user_jobs.append((f"user-{idx+1}-{name.replace(' ','_')}", pr))
         idx += 1
     return user_jobs
 
@@ -208,12 +230,14 @@ def main():
     jobs = generate_jobs(args.num_jobs, args.priority_levels, args.batch_min, args.batch_max, seed=seed)
 
     # Append user jobs at the end, assign arrival indices following auto-generated ones
-    base_idx = len(jobs)
-    for i, uj in enumerate(user_jobs):
-        uj["arrival_idx"] = base_idx + i
-        jobs.append(uj)
+    if user_jobs:
+        user_ids, user_priorities = zip(*user_jobs)
+        jobs["ids"] += user_ids
+        jobs["priorities"] = np.concatenate(
+            [jobs["priorities"], np.array(user_priorities, dtype=np.int64)])
+        jobs["arrival_idx"] = np.arange(len(jobs["ids"]))
 
-    total_jobs = len(jobs)
+    total_jobs = len(jobs["ids"])
     print(f"Final job count (auto + user): {total_jobs}")
 
     # Run PRS
@@ -223,6 +247,10 @@ def main():
     prs_metrics = compute_metrics(jobs, prs_order)
     pretty_print_metrics("PRS", prs_metrics, prs_time)
 
+    print("\nRunning PRS bulk index kernel...")
+    bulk_order, bulk_time = run_prs_bulk(jobs, k=args.row_capacity, n=args.priority_levels, m=max_rows)
+    pretty_print_metrics("PRS (bulk_drain_indices)", compute_metrics(jobs, bulk_order), bulk_time)
+
     # Run Global Priority Queue
     print("\nRunning Global Priority Queue (heapq)...")
     pq_order, pq_time = run_global_priority_queue(jobs)
@@ -238,11 +266,11 @@ def main():
     # Print samples
     sample = min(args.sample, total_jobs)
     print(f"\nFirst {sample} completions (PRS):")
-    print([j["id"] for j in prs_order[:sample]])
+    print([jobs["ids"][i] for i in prs_order[:sample]])
     print(f"\nFirst {sample} completions (PQ):")
-    print([j["id"] for j in pq_order[:sample]])
+    print([jobs["ids"][i] for i in pq_order[:sample]])
     print(f"\nFirst {sample} completions (STACK):")
-    print([j["id"] for j in st_order[:sample]])
+    print([jobs["ids"][i] for i in st_order[:sample]])
 
     print("\nDone. Interpretation hints:")
     print(" - Lower avg_completion_pos means jobs finished earlier on average.")
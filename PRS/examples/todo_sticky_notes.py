@@ -1,4 +1,5 @@
 import random
+import sys
 from prs import PRS, PriorityError
 
 def main():
@@ -18,22 +19,24 @@ def main():
     ]
 
     # Add tasks
+    log = []
     for task, prio in tasks:
         try:
             stack.push(task, prio)
-            print(f"📝 Added: {task} ({categories[prio]})")
+            log.append(f"📝 Added: {task} ({categories[prio]})")
         except PriorityError as e:
-            print(f"❌ Priority error for {task}: {e}")
+            log.append(f"❌ Priority error for {task}: {e}")
         except Exception as e:
-            print(f"❌ Couldn’t add {task}: {e}")
+            log.append(f"❌ Couldn’t add {task}: {e}")
 
-    print("\n=== Starting Day ===")
+    log.append("\n=== Starting Day ===")
     while not stack.is_empty():
         if random.random() > 0.2:  # sometimes skip tasks
             task = stack.pop()
-            print(f"✅ Completed: {task}")
+            log.append(f"✅ Completed: {task}")
         else:
-            print("⏸ Skipped a cycle (procrastination)")
+            log.append("⏸ Skipped a cycle (procrastination)")
+    sys.stdout.write("\n".join(log) + "\n")
 
     print("\nAll tasks done. PRS empty?", stack.is_empty())
 
@@ -2,9 +2,14 @@
 Professional implementation of Priority Row Stack (PRS).
 """
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import Generic, List, Optional, TypeVar
+from functools import lru_cache
+from typing import TYPE_CHECKING, Generic, Iterable, List, Optional, Sequence, Tuple, TypeVar
+import operator
 import threading
+import weakref
+
+if TYPE_CHECKING:
+    import numpy as np
 
 T = TypeVar("T")
 
@@ -31,22 +36,41 @@ class RowFullError(PRSError):
 # ----------------------------
 # Internal Row implementation
 # ----------------------------
-@dataclass
+@lru_cache(maxsize=None)
+def _bit_table(n: int) -> Tuple[int, ...]:
+    # ``1 << i`` for every bucket, as Python ints shared by all rows of width n.
+    # Indexing this table (rather than shifting by ``priority - 1``) keeps the
+    # row mask a Python int even when priorities are NumPy integers.
+    return tuple(1 << i for i in range(n))
+
+
 class PRSRow(Generic[T]):
-    k: int
-    n: int
-    buckets: List[List[T]] = field(default_factory=list)
-    count: int = 0
-    top_priority_idx: Optional[int] = None
-
-    def __post_init__(self) -> None:
-        if self.k <= 0:
+    # Hand-written with __slots__ (not a dataclass): a row is created every k
+    # pushes and its fields are read on every operation, so slot descriptors
+    # and the smaller per-instance footprint pay off.
+    __slots__ = ("k", "n", "count", "_nonempty_mask", "_bits", "_slots", "_tops")
+
+    def __init__(self, k: int, n: int) -> None:
+        if k <= 0:
             raise ValueError("k must be > 0")
-        if self.n <= 0:
+        if n <= 0:
             raise ValueError("n must be > 0")
-        if not self.buckets:
-            self.buckets = [[] for _ in range(self.n)]
-        self._recompute_top_priority()
+        self.k = k
+        self.n = n
+        self.count = 0
+        # Bit ``i`` is set iff bucket ``i`` is non-empty; the lowest set bit is the
+        # highest priority currently held by the row (see ``top_idx``).
+        self._nonempty_mask = 0
+        self._bits = _bit_table(n)
+        # Every priority bucket owns a preallocated slab of ``k`` cells inside one
+        # flat list, used as a stack with its own top pointer: bucket ``i`` lives in
+        # ``_slots[i*k : i*k + _tops[i]]``. A row never holds more than ``k`` items,
+        # so the slabs never grow or reallocate, and one list per row (rather than
+        # one per bucket) keeps row creation cheap. The tops stay a plain list: packing
+        # them as bytes of one int (SWAR) needs a shift and mask per access and
+        # benchmarks slower in CPython than a list subscript.
+        self._slots: List[Optional[T]] = [None] * (k * n)
+        self._tops: List[int] = [0] * n
 
     def is_full(self) -> bool:
         return self.count >= self.k
@@ -54,50 +78,78 @@ class PRSRow(Generic[T]):
     def is_empty(self) -> bool:
         return self.count == 0
 
-    def _recompute_top_priority(self) -> None:
-        self.top_priority_idx = None
-        for idx in range(self.n):
-            if self.buckets[idx]:
-                self.top_priority_idx = idx
-                return
+    @property
+    def top_idx(self) -> int:
+        mask = self._nonempty_mask
+        return (mask & -mask).bit_length() - 1
 
+    # Hot path: test ``count`` and the mask inline and keep attributes in locals
+    # rather than calling is_full()/is_empty()/top_idx on every operation.
     def push(self, item: T, priority: int) -> None:
         if not (1 <= priority <= self.n):
             raise PriorityError(f"priority must be between 1 and {self.n}, got {priority}")
-        if self.is_full():
+        k = self.k
+        if self.count >= k:
             raise RowFullError("row is full")
         idx = priority - 1
-        self.buckets[idx].append(item)
+        tops = self._tops
+        top = tops[idx]
+        self._slots[idx * k + top] = item
+        tops[idx] = top + 1
         self.count += 1
-        if self.top_priority_idx is None or idx < self.top_priority_idx:
-            self.top_priority_idx = idx
+        self._nonempty_mask |= self._bits[idx]
 
     def peek(self) -> T:
-        if self.is_empty():
+        if not self.count:
             raise EmptyError("peek from empty row")
-        if self.top_priority_idx is None:
-            self._recompute_top_priority()
-        assert self.top_priority_idx is not None
-        bucket = self.buckets[self.top_priority_idx]
-        return bucket[-1]
+        mask = self._nonempty_mask
+        idx = (mask & -mask).bit_length() - 1
+        return self._slots[idx * self.k + self._tops[idx] - 1]
 
     def pop(self) -> T:
-        if self.is_empty():
+        if not self.count:
             raise EmptyError("pop from empty row")
-        if self.top_priority_idx is None:
-            self._recompute_top_priority()
-        assert self.top_priority_idx is not None
-        bucket = self.buckets[self.top_priority_idx]
-        item = bucket.pop()
+        mask = self._nonempty_mask
+        idx = (mask & -mask).bit_length() - 1
+        tops = self._tops
+        slots = self._slots
+        top = tops[idx] - 1
+        pos = idx * self.k + top
+        item = slots[pos]
+        slots[pos] = None  # drop the reference so popped items can be collected
+        tops[idx] = top
         self.count -= 1
-        if not bucket:
-            self._recompute_top_priority()
+        if not top:
+            self._nonempty_mask = mask & ~self._bits[idx]
         return item
 
+    def _extend_unchecked(self, items: Sequence[T], priorities: Sequence[int]) -> None:
+        # Bulk push for PriorityRowStack.extend, which has already validated every
+        # priority and guarantees ``len(items) <= k - count``.
+        k = self.k
+        slots = self._slots
+        tops = self._tops
+        bits = self._bits
+        mask = self._nonempty_mask
+        for item, priority in zip(items, priorities):
+            idx = priority - 1
+            top = tops[idx]
+            slots[idx * k + top] = item
+            tops[idx] = top + 1
+            mask |= bits[idx]
+        self.count += len(items)
+        self._nonempty_mask = mask
+
     def tolist(self) -> List[T]:
+        # Slice-and-reverse each non-empty slab in C and append it with list +=.
+        k = self.k
+        slots = self._slots
         out: List[T] = []
-        for idx in range(self.n):
-            out.extend(reversed(self.buckets[idx]))
+        start = 0
+        for top in self._tops:
+            if top:
+                out += slots[start:start + top][::-1]
+            start += k
         return out
 
     def __len__(self) -> int:
@@ -105,9 +157,9 @@ class PRSRow(Generic[T]):
 
     def __repr__(self) -> str:
         parts = []
-        for i, b in enumerate(self.buckets, start=1):
-            if b:
-                parts.append(f"P{i}={len(b)}")
+        for i, top in enumerate(self._tops, start=1):
+            if top:
+                parts.append(f"P{i}={top}")
         return f"<Row count={self.count} {' '.join(parts)}>"
 
 
@@ -115,6 +167,11 @@ class PRSRow(Generic[T]):
 # Public Priority Row Stack
 # ----------------------------
 class PriorityRowStack(Generic[T]):
+    __slots__ = ("k", "n", "m", "_rows", "_size", "_lock", "__weakref__")
+
+    # The methods below never touch the lock. thread_safe=True instead switches
+    # the instance to a locking subclass in __init__ (see _locked_variant), so the
+    # lock decision is made once at construction rather than tested on every call.
     def __init__(self, k: int, n: int, m: Optional[int] = None, thread_safe: bool = False) -> None:
         if k <= 0 or n <= 0:
             raise ValueError("k and n must be > 0")
@@ -126,59 +183,86 @@ class PriorityRowStack(Generic[T]):
         self._rows: List[PRSRow[T]] = []
         self._size = 0
         self._lock = threading.RLock() if thread_safe else None
-
-    def _lock_acquire(self):
-        if self._lock:
-            self._lock.acquire()
-
-    def _lock_release(self):
-        if self._lock:
-            self._lock.release()
-
-    def _ensure_top_row(self) -> None:
-        if not self._rows or self._rows[-1].is_full():
-            if self.m is not None and len(self._rows) >= self.m and (not self._rows or self._rows[-1].is_full()):
-                raise PRSError("maximum number of rows reached (m)")
-            self._rows.append(PRSRow(self.k, self.n))
+        if thread_safe and not isinstance(self, _LockedMixin):
+            # The locked variant adds no slots, so the instance layout is unchanged.
+            self.__class__ = _locked_variant(type(self))
+
+    def _grow_and_push(self, item: T, priority: int) -> None:
+        if self.m is not None and len(self._rows) >= self.m:
+            raise PRSError("maximum number of rows reached (m)")
+        row: PRSRow[T] = PRSRow(self.k, self.n)
+        row.push(item, priority)  # validate before the new row becomes visible
+        self._rows.append(row)
+        self._size += 1
 
     def push(self, item: T, priority: int) -> None:
-        self._lock_acquire()
-        try:
-            self._ensure_top_row()
-            self._rows[-1].push(item, priority)
-            self._size += 1
-        finally:
-            self._lock_release()
-
+        # Fast path: the top row still has room. Only a full (or missing) top
+        # row falls through to _grow_and_push.
+        rows = self._rows
+        if rows:
+            top = rows[-1]
+            if top.count < self.k:
+                top.push(item, priority)
+                self._size += 1
+                return
+        self._grow_and_push(item, priority)
+
+    def extend(self, items: Iterable[T], priorities: Iterable[int]) -> None:
+        # Same result as pushing each (item, priority) pair in order, but priorities
+        # and the m limit are checked once up front (nothing is pushed on failure)
+        # and rows are filled in bulk.
+        items = list(items)
+        priorities = [operator.index(p) for p in priorities]  # rejects non-integers before any write
+        total = len(items)
+        if len(priorities) != total:
+            raise ValueError("items and priorities must have the same length")
+        if not total:
+            return
+        k, n = self.k, self.n
+        lo, hi = min(priorities), max(priorities)
+        if lo < 1 or hi > n:
+            raise PriorityError(f"priority must be between 1 and {n}, got {lo if lo < 1 else hi}")
+        rows = self._rows
+        free = k - rows[-1].count if rows else 0
+        new_rows = -(-(total - free) // k) if total > free else 0
+        if self.m is not None and len(rows) + new_rows > self.m:
+            raise PRSError("maximum number of rows reached (m)")
+        pos = min(free, total)
+        if pos:
+            rows[-1]._extend_unchecked(items[:pos], priorities[:pos])
+        while pos < total:
+            row: PRSRow[T] = PRSRow(k, n)
+            end = pos + k
+            row._extend_unchecked(items[pos:end], priorities[pos:end])
+            rows.append(row)
+            pos = end
+        self._size += total
+
+    # Invariant: every row in _rows is non-empty. push/extend only append rows that
+    # already hold an item and pop discards a row as soon as it drains, so the top
+    # of a non-empty PRS is always _rows[-1] and no empty-row sweep is needed.
     def peek(self) -> T:
-        self._lock_acquire()
-        try:
-            if self._size == 0:
-                raise EmptyError("peek from empty PRS")
-            while self._rows and self._rows[-1].is_empty():
-                self._rows.pop()
-            if not self._rows:
-                raise EmptyError("peek from empty PRS")
-            return self._rows[-1].peek()
-        finally:
-            self._lock_release()
+        if self._size == 0:
+            raise EmptyError("peek from empty PRS")
+        return self._rows[-1].peek()
 
     def pop(self) -> T:
-        self._lock_acquire()
-        try:
-            if self._size == 0:
-                raise EmptyError("pop from empty PRS")
-            while self._rows and self._rows[-1].is_empty():
-                self._rows.pop()
-            if not self._rows:
-                raise EmptyError("pop from empty PRS")
-            item = self._rows[-1].pop()
-            self._size -= 1
-            if self._rows and self._rows[-1].is_empty():
-                self._rows.pop()
-            return item
-        finally:
-            self._lock_release()
+        if self._size == 0:
+            raise EmptyError("pop from empty PRS")
+        rows = self._rows
+        row = rows[-1]
+        item = row.pop()
+        self._size -= 1
+        if not row.count:
+            rows.pop()
+            assert not rows or rows[-1].count, "PRS invariant broken: empty row on top"
+        return item
+
+    def tolist(self) -> List[T]:
+        out: List[T] = []
+        for row in reversed(self._rows):
+            out += row.tolist()
+        return out
 
     def is_empty(self) -> bool:
         return self._size == 0
@@ -189,15 +273,27 @@ class PriorityRowStack(Generic[T]):
     def rows_count(self) -> int:
         return len(self._rows)
 
-    def tolist(self) -> List[T]:
-        self._lock_acquire()
-        try:
-            out: List[T] = []
-            for row in reversed(self._rows):
-                out.extend(row.tolist())
-            return out
-        finally:
-            self._lock_release()
+    def bulk_drain_indices(self, priorities: Sequence[int]) -> np.ndarray:
+        # Completion order, as arrival indices, of pushing one item per priority into
+        # an empty PRS with this k/n/m and then popping everything. This stack's own
+        # contents are not touched. Requires NumPy; uses a Numba-compiled kernel when
+        # Numba is installed (see _drain.py).
+        import numpy as np
+        from ._drain import drain
+
+        pri = np.asarray(priorities)
+        if pri.ndim != 1:
+            raise ValueError(f"priorities must be one-dimensional, got {pri.ndim} dimensions")
+        if pri.size and not np.issubdtype(pri.dtype, np.integer):
+            raise TypeError(f"priorities must be integers, got dtype {pri.dtype}")
+        pri = pri.astype(np.int64, copy=False)
+        if pri.size:
+            lo, hi = int(pri.min()), int(pri.max())
+            if lo < 1 or hi > self.n:
+                raise PriorityError(f"priority must be between 1 and {self.n}, got {lo if lo < 1 else hi}")
+            if self.m is not None and -(-pri.size // self.k) > self.m:
+                raise PRSError("maximum number of rows reached (m)")
+        return drain(pri, self.k, self.n)
 
     def __len__(self) -> int:
         return self.size()
@@ -207,6 +303,48 @@ class PriorityRowStack(Generic[T]):
         return f"<PRS rows={len(self._rows)} size={self._size} top={top}>"
 
 
+class _LockedMixin:
+    # Wraps the mutating/reading operations of a PriorityRowStack (sub)class in the
+    # instance's RLock. Placed first in the MRO, so super() reaches any override
+    # a user subclass defines as well as the base implementation.
+    __slots__ = ()
+
+    def push(self, item, priority):
+        with self._lock:
+            super().push(item, priority)
+
+    def extend(self, items, priorities):
+        with self._lock:
+            super().extend(items, priorities)
+
+    def peek(self):
+        with self._lock:
+            return super().peek()
+
+    def pop(self):
+        with self._lock:
+            return super().pop()
+
+    def tolist(self):
+        with self._lock:
+            return super().tolist()
+
+
+# Keys are weak and values are weak references, so the cache never keeps a user
+# subclass (which every locked variant references as its base) alive.
+_LOCKED_VARIANTS: weakref.WeakKeyDictionary[type, weakref.ref[type]] = weakref.WeakKeyDictionary()
+
+
+def _locked_variant(cls: type) -> type:
+    ref = _LOCKED_VARIANTS.get(cls)
+    locked = ref() if ref is not None else None
+    if locked is None:
+        locked = type(f"Locked{cls.__name__}", (_LockedMixin, cls), {"__slots__": ()})
+        locked.__module__ = cls.__module__
+        _LOCKED_VARIANTS[cls] = weakref.ref(locked)
+    return locked
+
+
 # ----------------------------
 # Public API
 # ----------------------------
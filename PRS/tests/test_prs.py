@@ -1,5 +1,5 @@
 import pytest
-from prs import PRS, PriorityRowStack, PriorityError
+from prs import PRS, PriorityRowStack, PriorityError, PRSError
 
 def test_push_pop_basic():
     prs = PriorityRowStack(k=3, n=3)
@@ -43,4 +43,176 @@ def test_tolist_order():
     prs.push('b', 1)
     prs.push('c', 3)
     prs.push('d', 1)
-    assert prs.tolist() == ['d', 'b', 'a', 'c']
\ No newline at end of file
+    assert prs.tolist() == ['d', 'b', 'a', 'c']
+
+def test_row_slabs_interleaved():
+    prs = PriorityRowStack(k=4, n=3)
+    for item, p in [('a', 3), ('b', 1), ('c', 3), ('d', 1), ('e', 2), ('f', 3)]:
+        prs.push(item, p)
+    assert prs.tolist() == ['e', 'f', 'd', 'b', 'c', 'a']
+    assert [prs.pop() for _ in range(6)] == ['e', 'f', 'd', 'b', 'c', 'a']
+    assert prs.is_empty()
+
+def test_invalid_priority_does_not_open_row():
+    prs = PriorityRowStack(k=2, n=2)
+    with pytest.raises(PriorityError):
+        prs.push('bad', 5)
+    assert prs.rows_count() == 0
+    assert prs.is_empty()
+
+def test_thread_safe_matches_plain():
+    plain = PriorityRowStack(k=3, n=3)
+    locked = PriorityRowStack(k=3, n=3, thread_safe=True)
+    for prs in (plain, locked):
+        for item, p in [('a', 2), ('b', 1), ('c', 3), ('d', 2)]:
+            prs.push(item, p)
+    assert locked.tolist() == plain.tolist()
+    assert locked.peek() == plain.peek()
+    assert [locked.pop() for _ in range(4)] == [plain.pop() for _ in range(4)]
+
+def test_extend_matches_push():
+    items = [f"j{i}" for i in range(11)]
+    priorities = [3, 1, 2, 2, 1, 3, 3, 1, 2, 1, 2]
+    pushed = PriorityRowStack(k=4, n=3)
+    pushed.push('first', 2)
+    for item, p in zip(items, priorities):
+        pushed.push(item, p)
+    extended = PriorityRowStack(k=4, n=3)
+    extended.push('first', 2)
+    extended.extend(items, priorities)
+    assert extended.size() == pushed.size()
+    assert extended.rows_count() == pushed.rows_count()
+    assert extended.tolist() == pushed.tolist()
+    assert [extended.pop() for _ in range(12)] == [pushed.pop() for _ in range(12)]
+
+def test_extend_validates_before_pushing():
+    prs = PriorityRowStack(k=2, n=2, m=2)
+    with pytest.raises(PriorityError):
+        prs.extend(['a', 'b'], [1, 3])
+    with pytest.raises(PRSError):
+        prs.extend(['a', 'b', 'c', 'd', 'e'], [1, 1, 2, 2, 1])
+    with pytest.raises(ValueError):
+        prs.extend(['a', 'b'], [1])
+    assert prs.is_empty()
+    assert prs.rows_count() == 0
+    prs.push('z', 2)
+    with pytest.raises(TypeError):
+        prs.extend(['a', 'b'], [1, 1.5])
+    assert prs.size() == 1
+    assert prs.tolist() == ['z']
+
+def test_bulk_drain_indices_matches_pop_order():
+    np = pytest.importorskip("numpy")
+    from prs import _drain
+    priorities = [3, 1, 2, 2, 1, 3, 3, 1, 2, 1, 2, 3, 1]
+    prs = PriorityRowStack(k=4, n=3)
+    for idx, p in enumerate(priorities):
+        prs.push(idx, p)
+    expected = [prs.pop() for _ in range(len(priorities))]
+    assert PriorityRowStack(k=4, n=3).bulk_drain_indices(priorities).tolist() == expected
+    pri = np.array(priorities, dtype=np.int64)
+    assert _drain._drain_kernel(pri, 4, 3).tolist() == expected
+    assert _drain._drain_sorted(pri, 4, 3).tolist() == expected
+    with pytest.raises(PriorityError):
+        PriorityRowStack(k=4, n=2).bulk_drain_indices(priorities)
+    with pytest.raises(PRSError):
+        PriorityRowStack(k=4, n=3, m=3).bulk_drain_indices(priorities)
+    with pytest.raises(TypeError):
+        PriorityRowStack(k=4, n=3).bulk_drain_indices([1.7, 2.2])
+    with pytest.raises(ValueError):
+        PriorityRowStack(k=4, n=3).bulk_drain_indices([[1, 2], [1, 2]])
+    assert PriorityRowStack(k=4, n=3).bulk_drain_indices([]).tolist() == []
+
+def test_numpy_integer_priorities():
+    np = pytest.importorskip("numpy")
+    prs = PriorityRowStack(k=3, n=3)
+    prs.push('a', np.int64(2))
+    prs.push('b', np.int64(3))
+    prs.extend(['c', 'd', 'e'], np.array([3, 1, 2]))
+    assert prs.peek() == 'd'
+    assert [prs.pop() for _ in range(5)] == ['d', 'e', 'a', 'c', 'b']
+    wide = PriorityRowStack(k=2, n=70)
+    wide.push('x', np.int64(70))
+    wide.push('y', np.int64(65))
+    assert [wide.pop(), wide.pop()] == ['y', 'x']
+
+def test_thread_safe_stacks_take_the_lock():
+    import threading
+    from prs.core import _LockedMixin
+
+    class Forwarding(PriorityRowStack):
+        def __init__(self, thread_safe=True):
+            super().__init__(4, 3, thread_safe=thread_safe)
+
+    class KeywordOnly(PriorityRowStack):
+        def __init__(self, *, k, n):
+            super().__init__(k, n, None, True)
+
+    assert isinstance(PriorityRowStack(k=2, n=2, thread_safe=True), _LockedMixin)
+    assert isinstance(Forwarding(), _LockedMixin)
+    assert isinstance(KeywordOnly(k=2, n=2), _LockedMixin)
+    assert not isinstance(Forwarding(thread_safe=False), _LockedMixin)
+    assert not isinstance(PriorityRowStack(k=2, n=2), _LockedMixin)
+
+    prs = Forwarding()
+    held, release = threading.Event(), threading.Event()
+
+    def hold_lock():
+        with prs._lock:
+            held.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    held.wait()
+    pusher = threading.Thread(target=prs.push, args=('a', 1))
+    pusher.start()
+    pusher.join(0.1)
+    assert pusher.is_alive() and prs.is_empty()
+    release.set()
+    pusher.join()
+    holder.join()
+    assert prs.pop() == 'a'
+
+def test_subclass_overrides_are_used():
+    calls = []
+
+    class Logged(PriorityRowStack):
+        def push(self, item, priority):
+            calls.append(item)
+            super().push(item, priority)
+
+    for thread_safe in (False, True):
+        prs = Logged(k=2, n=2, thread_safe=thread_safe)
+        prs.push('a', 1)
+        assert isinstance(prs, Logged)
+        assert prs.pop() == 'a'
+    assert calls == ['a', 'a']
+
+def test_copy_and_collection():
+    import copy
+    import gc
+    import weakref
+
+    prs = PriorityRowStack(k=2, n=2)
+    prs.push('a', 1)
+    dup = copy.copy(prs)
+    dup.push('b', 1)
+    assert (prs.size(), dup.size()) == (1, 2)
+    assert weakref.ref(prs)() is prs
+    assert weakref.ref(PriorityRowStack(k=2, n=2, thread_safe=True)) is not None
+
+    class Item:
+        pass
+
+    item = Item()
+    ref = weakref.ref(item)
+    prs = PriorityRowStack(k=2, n=2, thread_safe=True)
+    prs.push(item, 1)
+    del item
+    gc.disable()
+    try:
+        del prs
+        assert ref() is None
+    finally:
+        gc.enable()